@@ -3,8 +3,10 @@ from PySide6.QtWidgets import ( QPlainTextEdit, QCompleter, QTextEdit, QToolTip
 from PySide6.QtCore import Qt,Signal
 from PySide6.QtGui import  QTextCharFormat, QFont, QSyntaxHighlighter, QTextCursor,QKeySequence, QColor
 from PySide6.QtCore import QRegularExpression
+from contextlib import contextmanager
 import jedi
 import re
+from Profiler import profiler
 
 class PythonHighlighter(QSyntaxHighlighter):
     def __init__(self, parent=None):
@@ -83,6 +85,7 @@ class PythonHighlighter(QSyntaxHighlighter):
         for word in words:
             pattern = QRegularExpression(r'\b' + word + r'\b')
             self.highlighting_rules.append((pattern, keyword_format))
+    @profiler.timed
     def highlightBlock(self, text):
         for pattern, format in self.highlighting_rules:
             match_iterator = pattern.globalMatch(text)
@@ -128,12 +131,69 @@ class CodeEditor(QPlainTextEdit):
         tc = self.textCursor()
         tc.select(QTextCursor.SelectionType.WordUnderCursor)
         return tc.selectedText()
+
+    @contextmanager
+    def edit_transaction(self):
+        """Group edits into one undo step; highlighting and the textChanged /
+        blockCountChanged slots run once, over the changed range, when the
+        outermost transaction ends."""
+        cursor = QTextCursor(self.document())
+        cursor.beginEditBlock()
+        try:
+            yield cursor
+        finally:
+            cursor.endEditBlock()
+
     def convert_spaces_to_tabs(self):
-        content = self.toPlainText()
-        converted_content = content.replace('    ', '\t')
-        
-        # Set the converted content back to the editor
-        self.setPlainText(converted_content)
+        blocks = []
+        block = self.document().firstBlock()
+        while block.isValid():
+            text = block.text()
+            indent = text[:len(text) - len(text.lstrip(' \t'))]
+            if '    ' in indent:
+                blocks.append((block, indent))
+            block = block.next()
+        if not blocks:
+            return
+
+        # Rewrite only the leading whitespace, keeping the undo history intact
+        with self.edit_transaction() as cursor:
+            for block, indent in blocks:
+                cursor.setPosition(block.position())
+                cursor.setPosition(block.position() + len(indent), QTextCursor.MoveMode.KeepAnchor)
+                cursor.insertText(indent.replace('    ', '\t'))
+
+    def reindent_selection(self, dedent=False):
+        cursor = self.textCursor()
+        document = self.document()
+        first = document.findBlock(cursor.selectionStart())
+        last = document.findBlock(cursor.selectionEnd())
+        if first == last:
+            return False
+        # A selection ending at the start of a line does not include that line
+        if cursor.selectionEnd() == last.position():
+            last = last.previous()
+
+        with self.edit_transaction() as edit:
+            block = first
+            while block.isValid():
+                edit.setPosition(block.position())
+                if not dedent:
+                    edit.insertText('\t')
+                elif block.text().startswith('\t'):
+                    edit.deleteChar()
+                if block == last:
+                    break
+                block = block.next()
+
+        # Keep the selection covering whole lines so Tab / Shift+Tab can repeat
+        cursor = self.textCursor()
+        end = cursor.selectionEnd()
+        cursor.setPosition(first.position())
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        self.setTextCursor(cursor)
+        return True
+
     def focusInEvent(self, event):
         if self.completer:
             self.completer.setWidget(self)
@@ -145,6 +205,7 @@ class CodeEditor(QPlainTextEdit):
         column = cursor.columnNumber()
         return line, column
 
+    @profiler.keystroke
     def keyPressEvent(self, event):
         if event.matches(QKeySequence.Save):
             return
@@ -154,6 +215,10 @@ class CodeEditor(QPlainTextEdit):
                 self.completer.popup().hide()
                 return
 
+        if event.key() in (Qt.Key.Key_Tab, Qt.Key.Key_Backtab):
+            if self.reindent_selection(dedent=event.key() == Qt.Key.Key_Backtab):
+                return
+
         isShortcut = (event.modifiers() == Qt.KeyboardModifier.ControlModifier and
                       event.key() == Qt.Key.Key_Space)
 
@@ -233,6 +298,7 @@ class CodeEditor(QPlainTextEdit):
             cursor.movePosition(QTextCursor.MoveOperation.Left, QTextCursor.MoveMode.MoveAnchor, 1)
             self.setTextCursor(cursor)
 
+    @profiler.timed
     def showJediInfoForSelection(self):
         cursor = self.textCursor()
         start = cursor.selectionStart()
@@ -0,0 +1,269 @@
+"""Opt-in performance instrumentation.
+
+Set VIMICODE_PROFILE=1 to enable it (VIMICODE_STALL_MS changes the stall
+threshold, 100 ms by default). It records timing spans around the editor
+handlers, event-loop stalls with the GUI thread's Python stack, and
+keystroke-to-paint latency. The data is shown in View > Performance Stats and
+can be exported as a Chrome trace (chrome://tracing or ui.perfetto.dev).
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from PySide6.QtWidgets import (QDialog, QPlainTextEdit, QPushButton, QVBoxLayout,
+                               QHBoxLayout, QFileDialog, QMessageBox)
+from PySide6.QtCore import QObject, QEvent, QTimer
+from PySide6.QtGui import QFont
+
+LATENCY_BUCKETS_MS = (1, 2, 4, 8, 16, 33, 50, 100, 200, 500)
+
+
+class Profiler(QObject):
+    def __init__(self, max_events=100000):
+        super().__init__()
+        self.enabled = False
+        self.stall_ms = 100
+        self.origin = time.perf_counter()
+        self.events = deque(maxlen=max_events)
+        self.spans = {}
+        self.stalls = deque(maxlen=100)
+        self.latencies = deque(maxlen=max_events)
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self._pending_keys = {}
+        self._lock = threading.Lock()
+        self._gui_thread = None
+        self._heartbeat = None
+        self._watchdog = None
+        self._last_beat = 0.0
+        self._stall_stack = None
+
+    def start(self, app, stall_ms=100):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.stall_ms = stall_ms
+        self._gui_thread = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        app.installEventFilter(self)
+
+        self._heartbeat = QTimer(self)
+        self._heartbeat.setInterval(max(10, stall_ms // 5))
+        self._heartbeat.timeout.connect(self._beat)
+        self._heartbeat.start()
+        self._watchdog = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def reset(self):
+        with self._lock:
+            self.events.clear()
+            self.spans.clear()
+            self.stalls.clear()
+            self.latencies.clear()
+            self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    # Timing spans
+
+    def timed(self, func):
+        """Decorator recording a span for every call while profiling is on."""
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, start, time.perf_counter())
+        return wrapper
+
+    def record(self, name, start, end, category="span", args=None):
+        duration = end - start
+        self.events.append((name, category, start, duration, args))
+        if category != "span":
+            return
+        stats = self.spans.get(name)
+        if stats is None:
+            self.spans[name] = [1, duration, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+
+    # Stall detection
+
+    def _beat(self):
+        now = time.perf_counter()
+        with self._lock:
+            if self._stall_stack is not None:
+                self.stalls.append((self._last_beat, now - self._last_beat, self._stall_stack))
+                self.record("event loop stall", self._last_beat, now, "stall",
+                            {"stack": self._stall_stack})
+                self._stall_stack = None
+            self._last_beat = now
+
+    def _watch(self):
+        threshold = self.stall_ms / 1000
+        while self.enabled:
+            time.sleep(threshold / 4)
+            with self._lock:
+                if self._stall_stack is not None:
+                    continue
+                if time.perf_counter() - self._last_beat < threshold:
+                    continue
+                frame = sys._current_frames().get(self._gui_thread)
+                if frame is not None:
+                    self._stall_stack = "".join(traceback.format_stack(frame))
+
+    # Keystroke-to-paint latency
+
+    def keystroke(self, func):
+        """Decorator for an editor's keyPressEvent.
+
+        The press is timed from inside the handler, so it is seen however Qt
+        delivered it (the completer popup forwards keys past application event
+        filters). It is only measured when it changed the text or the cursor;
+        otherwise no repaint follows and the next unrelated paint would be
+        counted instead.
+        """
+        @functools.wraps(func)
+        def wrapper(editor, event):
+            if not self.enabled:
+                return func(editor, event)
+            start = time.perf_counter()
+            cursor = editor.textCursor()
+            before = (editor.document().revision(), cursor.position(), cursor.anchor())
+            try:
+                return func(editor, event)
+            finally:
+                cursor = editor.textCursor()
+                if (editor.document().revision(), cursor.position(), cursor.anchor()) != before:
+                    self._pending_keys.setdefault(editor.viewport(), start)
+        return wrapper
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and obj in self._pending_keys:
+            start = self._pending_keys.pop(obj)
+            end = time.perf_counter()
+            latency_ms = (end - start) * 1000
+            self.latencies.append(latency_ms)
+            self.histogram[self._bucket(latency_ms)] += 1
+            self.record("keystroke to paint", start, end, "latency")
+        return False
+
+    def _bucket(self, latency_ms):
+        for i, limit in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= limit:
+                return i
+        return len(LATENCY_BUCKETS_MS)
+
+    # Reporting
+
+    def summary(self):
+        lines = [f"{'handler':<45} {'calls':>8} {'total ms':>10} {'avg ms':>8} {'max ms':>8}"]
+        for name, (count, total, longest) in sorted(self.spans.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<45} {count:>8} {total * 1000:>10.1f} "
+                         f"{total / count * 1000:>8.2f} {longest * 1000:>8.2f}")
+
+        lines.append("")
+        lines.append(f"Keystroke to paint ({len(self.latencies)} samples)")
+        if self.latencies:
+            samples = sorted(self.latencies)
+            lines.append(f"  median {samples[len(samples) // 2]:.1f} ms, "
+                         f"p95 {samples[int(len(samples) * 0.95)]:.1f} ms, max {samples[-1]:.1f} ms")
+        lower = 0
+        for limit, count in zip(LATENCY_BUCKETS_MS + (None,), self.histogram):
+            label = f"{lower}-{limit} ms" if limit is not None else f">{lower} ms"
+            lines.append(f"  {label:>12} {count:>6} {'#' * min(count, 60)}")
+            lower = limit
+
+        lines.append("")
+        lines.append(f"Event loop stalls over {self.stall_ms} ms: {len(self.stalls)}")
+        if self.stalls:
+            start, duration, stack = self.stalls[-1]
+            lines.append(f"Last stall: {duration * 1000:.0f} ms at {start - self.origin:.1f} s")
+            lines.append(stack)
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, path):
+        pid = os.getpid()
+        trace = []
+        for name, category, start, duration, args in list(self.events):
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": self._gui_thread,
+            }
+            if args:
+                event["args"] = args
+            trace.append(event)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+class ProfilerPanel(QDialog):
+    def __init__(self, profiler, parent=None):
+        super().__init__(parent)
+        self.profiler = profiler
+        self.setWindowTitle("Performance Stats")
+        self.resize(800, 600)
+
+        self.view = QPlainTextEdit(self)
+        self.view.setReadOnly(True)
+        self.view.setFont(QFont("Courier", 9))
+
+        refresh_button = QPushButton("Refresh", self)
+        refresh_button.clicked.connect(self.refresh)
+        reset_button = QPushButton("Reset", self)
+        reset_button.clicked.connect(self.reset)
+        export_button = QPushButton("Export Chrome Trace...", self)
+        export_button.clicked.connect(self.export_trace)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(refresh_button)
+        buttons.addWidget(reset_button)
+        buttons.addStretch()
+        buttons.addWidget(export_button)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.view)
+        layout.addLayout(buttons)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def refresh(self):
+        self.view.setPlainText(self.profiler.summary())
+
+    def reset(self):
+        self.profiler.reset()
+        self.refresh()
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Chrome Trace", "trace.json", "JSON (*.json)")
+        if path:
+            try:
+                self.profiler.export_chrome_trace(path)
+            except IOError:
+                QMessageBox.critical(self, "Error", f"Unable to write trace: {path}")
+
+
+profiler = Profiler()
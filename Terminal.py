@@ -1,11 +1,12 @@
 import os
 import shlex
 import subprocess
-from PySide6.QtWidgets import QTextEdit
+from PySide6.QtWidgets import QPlainTextEdit
 from PySide6.QtCore import Qt, QProcess, Signal
 from PySide6.QtGui import QTextCursor
+from Profiler import profiler
 
-class Terminal(QTextEdit):
+class Terminal(QPlainTextEdit):
     command_executed = Signal()
 
     def __init__(self, parent=None):
@@ -147,11 +148,13 @@ class Terminal(QTextEdit):
         self.appendPlainText(self.prompt)
         self.command_executed.emit()
 
+    @profiler.timed
     def handle_stdout(self):
         data = self.process.readAllStandardOutput()
         stdout = bytes(data).decode("utf8")
         self.appendPlainText(stdout)
 
+    @profiler.timed
     def handle_stderr(self):
         data = self.process.readAllStandardError()
         stderr = bytes(data).decode("utf8")
@@ -0,0 +1,258 @@
+"""Headless benchmarks for the editor hot paths.
+
+Runs without a display (QT_QPA_PLATFORM=offscreen) and writes the results to
+a JSON file so runs from different commits can be compared:
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import PySide6
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt, QEvent, QEventLoop, QProcess
+from PySide6.QtGui import QKeyEvent, QTextCursor, QTextDocument
+
+from CodeEditor import PythonHighlighter
+from Terminal import Terminal
+from main import TextEditor
+
+HIGHLIGHT_LINES = (1000, 10000, 100000)
+OPEN_FILE_LINES = (1000, 10000)
+TYPED_TEXT = "total = sum(value.count for value in values if value) "
+
+# Writes the requested number of bytes to stdout as 80 column lines
+PRODUCER = (
+    "import sys\n"
+    "remaining = int(sys.argv[1])\n"
+    "chunk = (b'x' * 79 + b'\\n') * 13107\n"
+    "while remaining > 0:\n"
+    "    sys.stdout.buffer.write(chunk[:remaining])\n"
+    "    remaining -= len(chunk)\n"
+)
+
+
+def synthetic_source(lines):
+    """Return `lines` lines of plausible Python source."""
+    template = [
+        "class Widget{n}(object):",
+        "    # keeps track of item {n}",
+        "    def __init__(self, name, size={n}):",
+        "        self.name = name",
+        "        self.items = [str(i) for i in range(size)]",
+        "",
+        "    def render{n}(self, values):",
+        "        if not isinstance(values, list):",
+        "            return None",
+        "        total = sum(len(v) for v in values)",
+        "        print(\"rendering\", self.name, 'total', total)",
+        "        return sorted(values, key=len)",
+        "",
+    ]
+    out = []
+    n = 0
+    while len(out) < lines:
+        out.extend(line.format(n=n) for line in template)
+        n += 1
+    return "\n".join(out[:lines]) + "\n"
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "min_ms": samples[0] * 1000,
+        "median_ms": statistics.median(samples) * 1000,
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        "max_ms": samples[-1] * 1000,
+    }
+
+
+def bench_highlighter(repeat):
+    results = {}
+    for lines in HIGHLIGHT_LINES:
+        document = QTextDocument()
+        document.setPlainText(synthetic_source(lines))
+        highlighter = PythonHighlighter(document)
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            highlighter.rehighlight()
+            samples.append(time.perf_counter() - start)
+        best = min(samples)
+        results[f"highlighter/{lines}_lines/seconds"] = best
+        results[f"highlighter/{lines}_lines/lines_per_second"] = lines / best
+    return results
+
+
+def bench_open_file(app, repeat):
+    results = {}
+    editor = TextEditor()
+    editor.show()
+    with tempfile.TemporaryDirectory() as directory:
+        for lines in OPEN_FILE_LINES:
+            path = os.path.join(directory, f"source_{lines}.py")
+            with open(path, "w") as f:
+                f.write(synthetic_source(lines))
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                editor.open_file(editor.model.index(path))
+                app.processEvents()
+                samples.append(time.perf_counter() - start)
+                editor.close_tab(editor.tab_widget.currentIndex())
+            results[f"open_file/{lines}_lines/seconds"] = min(samples)
+    editor.close()
+    return results
+
+
+def bench_typing(app, keystrokes):
+    typed = (TYPED_TEXT * (keystrokes // len(TYPED_TEXT) + 1))[:keystrokes]
+    editor = TextEditor()
+    failures = []
+
+    # Count completion slots that raise, a timing taken on the error path is not a result
+    def update_completer_words():
+        try:
+            TextEditor.updateCompleterWords(editor)
+        except Exception as e:
+            failures.append(e)
+            raise
+    editor.updateCompleterWords = update_completer_words
+    editor.show()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The jedi script is built from the file on disk, so the last line on
+        # disk holds the text that gets typed and is emptied in the buffer.
+        # Every keystroke then completes at a position the script can resolve.
+        path = os.path.join(directory, "typing.py")
+        with open(path, "w") as f:
+            f.write(synthetic_source(OPEN_FILE_LINES[0]) + typed)
+        editor.open_file(editor.model.index(path))
+        tab = editor.tab_widget.currentWidget()
+        tab.setFocus()
+        cursor = tab.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        tab.setTextCursor(cursor)
+        app.processEvents()
+        failures.clear()
+
+        samples = []
+        for ch in typed:
+            event = QKeyEvent(QEvent.Type.KeyPress, Qt.Key(ord(ch.upper())),
+                              Qt.KeyboardModifier.NoModifier, ch)
+            start = time.perf_counter()
+            tab.keyPressEvent(event)
+            samples.append(time.perf_counter() - start)
+            app.processEvents()
+    editor.close()
+    results = {f"typing/keypress/{name}": value for name, value in summarize(samples).items()}
+    results["typing/completion_failures"] = len(failures)
+    return results
+
+
+def bench_terminal(app, megabytes):
+    size = megabytes * 1024 * 1024
+    terminal = Terminal()
+    terminal.show()
+    loop = QEventLoop()
+    terminal.process = QProcess(terminal)
+    terminal.process.readyReadStandardOutput.connect(terminal.handle_stdout)
+    terminal.process.finished.connect(loop.quit)
+    # Without this a producer that fails to start would leave the loop running forever
+    errors = []
+    terminal.process.errorOccurred.connect(errors.append)
+    terminal.process.errorOccurred.connect(loop.quit)
+
+    start = time.perf_counter()
+    terminal.process.start(sys.executable, ["-c", PRODUCER, str(size)])
+    loop.exec()
+    elapsed = time.perf_counter() - start
+    process = terminal.process
+    terminal.process = None
+    terminal.close()
+    if errors:
+        raise RuntimeError(f"terminal benchmark producer failed: {process.errorString()}")
+    if process.exitStatus() != QProcess.ExitStatus.NormalExit or process.exitCode() != 0:
+        raise RuntimeError(f"terminal benchmark producer exited with code {process.exitCode()}")
+    return {
+        f"terminal/{megabytes}_mb/seconds": elapsed,
+        f"terminal/{megabytes}_mb/mb_per_second": megabytes / elapsed,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(f"{'metric':<45} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for name, value in results.items():
+        if name in baseline and baseline[name]:
+            print(f"{name:<45} {baseline[name]:>12.4f} {value:>12.4f} {value / baseline[name]:>8.2f}")
+
+
+def main():
+    benchmarks = ["highlighter", "open_file", "typing", "terminal"]
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="BASELINE_JSON")
+    parser.add_argument("--only", nargs="+", choices=benchmarks, default=benchmarks)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keystrokes", type=int, default=500)
+    parser.add_argument("--terminal-mb", type=int, default=100)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    if "highlighter" in args.only:
+        results.update(bench_highlighter(args.repeat))
+    if "open_file" in args.only:
+        results.update(bench_open_file(app, args.repeat))
+    if "typing" in args.only:
+        results.update(bench_typing(app, args.keystrokes))
+    if "terminal" in args.only:
+        results.update(bench_terminal(app, args.terminal_mb))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "pyside": PySide6.__version__,
+            "platform": platform.platform(),
+            "qpa_platform": os.environ.get("QT_QPA_PLATFORM"),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, value in results.items():
+        print(f"{name:<45} {value:>12.4f}")
+    if args.compare:
+        compare(results, args.compare)
+    if results.get("typing/completion_failures"):
+        sys.exit(f"{results['typing/completion_failures']} completion updates raised during "
+                 "the typing benchmark, its timings are not valid")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@ import jedi.api
 import jedi.api.environment
 from Terminal import Terminal
 from CodeEditor import CodeEditor
+from Profiler import profiler, ProfilerPanel
 class TextEditor(QMainWindow):
 	def __init__(self):
 		super().__init__()
@@ -104,7 +105,21 @@ class TextEditor(QMainWindow):
 		save_action = QAction("&Save", self)
 		save_action.triggered.connect(self.save_file)
 		file_menu.addAction(save_action)
+
+		if profiler.enabled:
+			view_menu = QMenu("&View", self)
+			menu_bar.addMenu(view_menu)
+
+			stats_action = QAction("Performance Stats", self)
+			stats_action.triggered.connect(self.show_profiler_panel)
+			view_menu.addAction(stats_action)
 	
+	def show_profiler_panel(self):
+		if not hasattr(self, 'profiler_panel'):
+			self.profiler_panel = ProfilerPanel(profiler, self)
+		self.profiler_panel.show()
+		self.profiler_panel.raise_()
+
 	def open_folder(self):
 		folder = QFileDialog.getExistingDirectory(self, "Select Folder")
 		if folder:
@@ -126,6 +141,9 @@ class TextEditor(QMainWindow):
 				content = file.read()
 				new_tab = CodeEditor(self)
 				new_tab.setPlainText(content)
+				new_tab.convert_spaces_to_tabs()
+				# The conversion is part of loading, not something to undo
+				new_tab.document().clearUndoRedoStacks()
 				new_tab.file_path = file_path
 				new_tab.setCompleter(self.completer)
 				new_tab.blockCountChanged.connect(self.update_completer)
@@ -134,9 +152,7 @@ class TextEditor(QMainWindow):
 				tab_name = os.path.basename(file_path)
 				self.tab_widget.addTab(new_tab, tab_name)
 				self.tab_widget.setCurrentWidget(new_tab)
-				new_tab.convert_spaces_to_tabs()
 
-			
 				self.update_completer()
 			
 	def update_terminal_directory(self, directory):
@@ -145,6 +161,7 @@ class TextEditor(QMainWindow):
 	def close_tab(self, index):
 		self.tab_widget.removeTab(index)
 	blockCounter = 5
+	@profiler.timed
 	def update_completer(self):
 		self.blockCounter += 1
 		if self.blockCounter >= 5:
@@ -160,6 +177,7 @@ class TextEditor(QMainWindow):
 					self.terminal.jscript = self.script
 				except:
 					pass
+	@profiler.timed
 	def updateCompleterWords(self):
 		current_tab = self.tab_widget.currentWidget()
 		line, column = current_tab.get_current_line_column()
@@ -270,6 +288,14 @@ class TextEditor(QMainWindow):
 if __name__ == "__main__":
 
 	app = QApplication(sys.argv)
+	if os.environ.get("VIMICODE_PROFILE", "").lower() in ("1", "true", "yes", "on"):
+		try:
+			stall_ms = int(os.environ.get("VIMICODE_STALL_MS", 100))
+		except ValueError:
+			stall_ms = 100
+		if stall_ms <= 0:
+			stall_ms = 100
+		profiler.start(app, stall_ms=stall_ms)
 	editor = TextEditor()
 	editor.show()
 	sys.exit(app.exec())